@@ -1,11 +1,14 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
+import hashlib
 import joblib
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime
 import logging
+import threading
 
 # Import custom modules
 from models.air_quality_model import AirQualityModel
@@ -23,6 +26,34 @@ logger = logging.getLogger(__name__)
 model = None
 preprocessor = None
 
+# Explanations keyed by (model version, input hash), least recently used evicted first
+EXPLANATION_CACHE_SIZE = 4096
+explanation_cache = OrderedDict()
+explanation_cache_lock = threading.Lock()
+
+# Upper bound on samples per /explain request so one call cannot flood the cache
+MAX_EXPLAIN_SAMPLES = 256
+
+def extract_features(data):
+    """Map request JSON fields onto the dataset's column names"""
+    return {
+        'Date': data.get('date', datetime.now().strftime('%Y-%m-%d')),
+        'Time': data.get('time', datetime.now().strftime('%H:%M:%S')),
+        'CO(GT)': data.get('co', None),
+        'PT08.S1(CO)': data.get('pt08_s1', None),
+        'NMHC(GT)': data.get('nmhc', None),
+        'C6H6(GT)': data.get('c6h6', None),
+        'PT08.S2(NMHC)': data.get('pt08_s2', None),
+        'NOx(GT)': data.get('nox', None),
+        'PT08.S3(NOx)': data.get('pt08_s3', None),
+        'NO2(GT)': data.get('no2', None),
+        'PT08.S4(NO2)': data.get('pt08_s4', None),
+        'PT08.S5(O3)': data.get('pt08_s5', None),
+        'T': data.get('temperature', None),
+        'RH': data.get('humidity', None),
+        'AH': data.get('absolute_humidity', None)
+    }
+
 @app.route('/')
 def home():
     return jsonify({
@@ -31,7 +62,8 @@ def home():
         "endpoints": {
             "/predict": "POST - Make predictions",
             "/health": "GET - Check API health",
-            "/model-info": "GET - Get model information"
+            "/model-info": "GET - Get model information",
+            "/explain": "POST - Explain predictions with per-feature contributions"
         }
     })
 
@@ -52,7 +84,9 @@ def model_info():
         "model_type": "XGBoost Regression",
         "features": model.feature_names,
         "targets": model.target_names,
-        "model_accuracy": getattr(model, 'accuracy', 'Not available')
+        "model_accuracy": getattr(model, 'accuracy', 'Not available'),
+        "model_version": model.get_model_version(),
+        "feature_importance": model.get_feature_importances()
     })
 
 @app.route('/predict', methods=['POST'])
@@ -67,23 +101,7 @@ def predict():
             return jsonify({"error": "No data provided"}), 400
         
         # Extract features from request
-        features = {
-            'Date': data.get('date', datetime.now().strftime('%Y-%m-%d')),
-            'Time': data.get('time', datetime.now().strftime('%H:%M:%S')),
-            'CO(GT)': data.get('co', None),
-            'PT08.S1(CO)': data.get('pt08_s1', None),
-            'NMHC(GT)': data.get('nmhc', None),
-            'C6H6(GT)': data.get('c6h6', None),
-            'PT08.S2(NMHC)': data.get('pt08_s2', None),
-            'NOx(GT)': data.get('nox', None),
-            'PT08.S3(NOx)': data.get('pt08_s3', None),
-            'NO2(GT)': data.get('no2', None),
-            'PT08.S4(NO2)': data.get('pt08_s4', None),
-            'PT08.S5(O3)': data.get('pt08_s5', None),
-            'T': data.get('temperature', None),
-            'RH': data.get('humidity', None),
-            'AH': data.get('absolute_humidity', None)
-        }
+        features = extract_features(data)
         
         # Create DataFrame
         input_df = pd.DataFrame([features])
@@ -111,6 +129,83 @@ def predict():
         logger.error(f"Prediction error: {str(e)}")
         return jsonify({"error": f"Prediction failed: {str(e)}"}), 500
 
+def explain_rows(processed_data):
+    """Explain each processed row, computing only cache misses in a single batch"""
+    # Bind the model once so a concurrent /train cannot mix versions within a call
+    current = model
+    version = current.get_model_version()
+    keys = [
+        (version, hashlib.sha256(np.ascontiguousarray(row, dtype=np.float64).tobytes()).hexdigest())
+        for row in processed_data
+    ]
+    
+    # Keep local references so concurrent evictions cannot remove entries we return
+    found = {}
+    with explanation_cache_lock:
+        for key in keys:
+            if key in explanation_cache:
+                explanation_cache.move_to_end(key)
+                found[key] = explanation_cache[key]
+    
+    missing = [i for i, key in enumerate(keys) if key not in found]
+    if missing:
+        contributions = current.explain(processed_data[missing])
+        computed = {}
+        for j, i in enumerate(missing):
+            explanation = {}
+            for target, values in contributions.items():
+                row = values[j]
+                explanation[target] = {
+                    "prediction": float(row.sum()),
+                    "bias": float(row[-1]),
+                    "contributions": dict(zip(current.feature_names, map(float, row[:-1])))
+                }
+            computed[keys[i]] = explanation
+        found.update(computed)
+        
+        with explanation_cache_lock:
+            explanation_cache.update(computed)
+            while len(explanation_cache) > EXPLANATION_CACHE_SIZE:
+                explanation_cache.popitem(last=False)
+    
+    return [found[key] for key in keys], len(keys) - len(missing), version
+
+@app.route('/explain', methods=['POST'])
+def explain():
+    try:
+        if model is None:
+            return jsonify({"error": "Model not loaded. Please train the model first."}), 500
+        
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+        
+        # Accept a single sample or a list of samples
+        samples = data if isinstance(data, list) else [data]
+        
+        if not all(isinstance(sample, dict) for sample in samples):
+            return jsonify({"error": "Each sample must be a JSON object"}), 400
+        
+        if len(samples) > MAX_EXPLAIN_SAMPLES:
+            return jsonify({"error": f"At most {MAX_EXPLAIN_SAMPLES} samples can be explained per request"}), 400
+        
+        input_df = pd.DataFrame([extract_features(sample) for sample in samples])
+        processed_data = preprocessor.preprocess_input(input_df)
+        
+        explanations, cache_hits, version = explain_rows(np.asarray(processed_data))
+        
+        return jsonify({
+            "explanations": explanations,
+            "model_version": version,
+            "cache_hits": cache_hits,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Explanation error: {str(e)}")
+        return jsonify({"error": f"Explanation failed: {str(e)}"}), 500
+
 @app.route('/train', methods=['POST'])
 def train_model():
     try:
@@ -127,6 +222,10 @@ def train_model():
         preprocessor = DataPreprocessor()
         preprocessor.fit(dataset_path)
         
+        # Explanations from the previous model version can no longer be served
+        with explanation_cache_lock:
+            explanation_cache.clear()
+        
         return jsonify({
             "message": "Model trained successfully",
             "accuracy": getattr(model, 'accuracy', 'Not available'),
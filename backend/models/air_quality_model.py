@@ -5,9 +5,13 @@ from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 from sklearn.preprocessing import StandardScaler
 import xgboost as xgb
 import joblib
+import hashlib
+import json
 import os
 import logging
 
+from models.compact_model import COMPACT_FORMAT_VERSION
+
 logger = logging.getLogger(__name__)
 
 class AirQualityModel:
@@ -17,9 +21,11 @@ class AirQualityModel:
         self.feature_names = []
         self.target_names = ['CO(GT)', 'NO2(GT)', 'C6H6(GT)']
         self.accuracy = {}
+        self.feature_importance = {}
+        self.version = None
         
-    def load_data(self, dataset_path):
-        """Load and prepare the UCI Air Quality dataset"""
+    def parse_data(self, dataset_path):
+        """Parse the UCI Air Quality dataset, leaving missing values as NaN"""
         try:
             # Load the dataset
             df = pd.read_csv(dataset_path, sep=';', decimal=',')
@@ -42,6 +48,9 @@ class AirQualityModel:
             df['day_of_week'] = df['Date'].dt.dayofweek
             df['month'] = df['Date'].dt.month
             
+            # Keep the hourly timestamp as the index for time-ordered evaluation
+            df.index = pd.DatetimeIndex(df['Date'] + pd.to_timedelta(df['hour'], unit='h'), name='datetime')
+            
             # Drop original date and time columns
             df = df.drop(['Date', 'Time'], axis=1)
             
@@ -53,6 +62,17 @@ class AirQualityModel:
             # Drop columns with too many missing values
             df = df.dropna(thresh=len(df.columns) * 0.8)
             
+            return df
+            
+        except Exception as e:
+            logger.error(f"Error parsing dataset: {e}")
+            raise
+    
+    def load_data(self, dataset_path):
+        """Load and prepare the UCI Air Quality dataset"""
+        try:
+            df = self.parse_data(dataset_path)
+            
             # Fill remaining missing values with median
             df = df.fillna(df.median())
             
@@ -79,6 +99,16 @@ class AirQualityModel:
         
         return X, y
     
+    def create_regressor(self, n_jobs=-1):
+        """Create an untrained regressor with the production hyperparameters"""
+        return xgb.XGBRegressor(
+            n_estimators=100,
+            learning_rate=0.1,
+            max_depth=6,
+            random_state=42,
+            n_jobs=n_jobs
+        )
+    
     def train(self, dataset_path):
         """Train the model on the dataset"""
         try:
@@ -103,13 +133,7 @@ class AirQualityModel:
                 X_test_scaled = scaler.transform(X_test)
                 
                 # Train XGBoost model
-                model = xgb.XGBRegressor(
-                    n_estimators=100,
-                    learning_rate=0.1,
-                    max_depth=6,
-                    random_state=42,
-                    n_jobs=-1
-                )
+                model = self.create_regressor()
                 
                 model.fit(X_train_scaled, y_train[target])
                 
@@ -135,6 +159,12 @@ class AirQualityModel:
                 
                 logger.info(f"{target} - R²: {r2:.4f}, RMSE: {np.sqrt(mse):.4f}")
             
+            # Store introspection data in the artifact so serving never recomputes it
+            self.feature_importance = {
+                target: self.get_feature_importance(target) for target in self.target_names
+            }
+            self.version = self._compute_version()
+            
             # Save models and scalers
             self.save_models()
             
@@ -225,8 +255,179 @@ class AirQualityModel:
         if target in self.models:
             model = self.models[target]
             importance = model.feature_importances_
-            feature_importance = dict(zip(self.feature_names, importance))
+            feature_importance = dict(zip(self.feature_names, map(float, importance)))
             return dict(sorted(feature_importance.items(), key=lambda x: x[1], reverse=True))
         else:
             return {}
 
+    def get_feature_importances(self):
+        """Get feature importances for all targets, as stored at train time
+        
+        Each target maps to a list ranked from most to least important, so the
+        order survives JSON serialisation with sorted keys.
+        """
+        if not getattr(self, 'feature_importance', None):
+            # Artifacts saved before importances were stored compute them once here
+            self.feature_importance = {
+                target: self.get_feature_importance(target) for target in self.models
+            }
+        return {
+            target: [
+                {'feature': feature, 'importance': float(value)}
+                for feature, value in sorted(importance.items(), key=lambda x: x[1], reverse=True)
+            ]
+            for target, importance in self.feature_importance.items()
+        }
+    
+    def _compute_version(self):
+        """Hash the raw boosters so the version changes whenever the models do"""
+        digest = hashlib.sha256()
+        for target in self.target_names:
+            if target in self.models:
+                digest.update(target.encode())
+                digest.update(bytes(self.models[target].get_booster().save_raw()))
+        return digest.hexdigest()[:12]
+    
+    def get_model_version(self):
+        """Get the version identifier of the trained models"""
+        if not getattr(self, 'version', None):
+            self.version = self._compute_version()
+        return self.version
+    
+    def explain(self, X):
+        """Get per-feature contributions for each prediction via XGBoost's pred_contribs"""
+        try:
+            if not self.models:
+                raise ValueError("No trained models available. Please train the model first.")
+            
+            # Ensure X has the correct features
+            if hasattr(X, 'columns'):
+                X = X[self.feature_names]
+            else:
+                X = pd.DataFrame(X, columns=self.feature_names)
+            
+            contributions = {}
+            
+            for target in self.target_names:
+                if target in self.models and target in self.scalers:
+                    X_scaled = self.scalers[target].transform(X)
+                    
+                    # One batched call; the last column holds the bias term
+                    dmatrix = xgb.DMatrix(X_scaled)
+                    contributions[target] = self.models[target].get_booster().predict(
+                        dmatrix, pred_contribs=True
+                    )
+                else:
+                    logger.warning(f"Model for {target} not found")
+            
+            return contributions
+            
+        except Exception as e:
+            logger.error(f"Error during explanation: {e}")
+            raise
+    
+    def export_compact(self, path='models/air_quality_model_compact.npz', precision='float32'):
+        """Export the trees into a NumPy-only model file with leaves at reduced precision
+        
+        Split thresholds always stay float32, the precision XGBoost compares in, so
+        every sample follows the same path as in the full model; only the leaf
+        values are rounded to the requested precision.
+        """
+        try:
+            if not self.models:
+                raise ValueError("No trained models available. Please train the model first.")
+            if precision not in ('float32', 'float16'):
+                raise ValueError(f"Unsupported precision: {precision}")
+
+            dtype = np.dtype(precision)
+            trees_by_target = {}
+            used_features = set()
+
+            for target in self.target_names:
+                booster = self.models[target].get_booster()
+                learner = json.loads(booster.save_raw('json'))['learner']
+                trees = learner['gradient_booster']['model']['trees']
+                base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+                trees_by_target[target] = (trees, base_score)
+
+                for tree in trees:
+                    for left, feature in zip(tree['left_children'], tree['split_indices']):
+                        if left != -1:
+                            used_features.add(feature)
+
+            # Prune features no tree ever splits on, across all targets
+            kept = sorted(used_features)
+            remap = {feature: i for i, feature in enumerate(kept)}
+
+            arrays = {
+                'format_version': np.array(COMPACT_FORMAT_VERSION),
+                'precision': np.array(precision),
+                'input_feature_names': np.array(self.feature_names),
+                'feature_names': np.array([self.feature_names[i] for i in kept]),
+                'target_names': np.array(self.target_names)
+            }
+
+            for i, target in enumerate(self.target_names):
+                trees, base_score = trees_by_target[target]
+                max_nodes = max(len(tree['left_children']) for tree in trees)
+                shape = (len(trees), max_nodes)
+
+                split_feature = np.zeros(shape, dtype=np.int16)
+                threshold = np.zeros(shape, dtype=np.float32)
+                leaf_value = np.zeros(shape, dtype=dtype)
+                left = np.full(shape, -1, dtype=np.int16)
+                right = np.full(shape, -1, dtype=np.int16)
+                default_left = np.zeros(shape, dtype=bool)
+                max_depth = 0
+
+                for t, tree in enumerate(trees):
+                    n = len(tree['left_children'])
+                    children_left = np.array(tree['left_children'])
+                    is_leaf = children_left == -1
+
+                    split_feature[t, :n] = [
+                        0 if leaf else remap[f] for leaf, f in zip(is_leaf, tree['split_indices'])
+                    ]
+                    # XGBoost stores leaf values in split_conditions for leaf nodes
+                    conditions = np.array(tree['split_conditions'], dtype=np.float32)
+                    threshold[t, :n] = np.where(is_leaf, 0, conditions)
+                    leaf_value[t, :n] = np.where(is_leaf, conditions, 0)
+                    left[t, :n] = children_left
+                    right[t, :n] = tree['right_children']
+                    default_left[t, :n] = np.array(tree['default_left'], dtype=bool)
+
+                    depth = np.zeros(n, dtype=int)
+                    for node in range(n):
+                        if not is_leaf[node]:
+                            depth[tree['left_children'][node]] = depth[node] + 1
+                            depth[tree['right_children'][node]] = depth[node] + 1
+                    max_depth = max(max_depth, int(depth.max()))
+
+                scaler = self.scalers[target]
+                prefix = f't{i}_'
+                arrays.update({
+                    prefix + 'scaler_mean': scaler.mean_[kept],
+                    prefix + 'scaler_scale': scaler.scale_[kept],
+                    prefix + 'base_score': np.array(base_score),
+                    prefix + 'max_depth': np.array(max_depth),
+                    prefix + 'split_feature': split_feature,
+                    prefix + 'threshold': threshold,
+                    prefix + 'leaf_value': leaf_value,
+                    prefix + 'left': left,
+                    prefix + 'right': right,
+                    prefix + 'default_left': default_left
+                })
+
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+
+            logger.info(f"Compact {precision} model exported to {path} "
+                        f"({len(kept)} of {len(self.feature_names)} features kept)")
+            return path
+
+        except Exception as e:
+            logger.error(f"Error exporting compact model: {e}")
+            raise
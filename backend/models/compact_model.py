@@ -0,0 +1,110 @@
+import numpy as np
+
+COMPACT_FORMAT_VERSION = 2
+
+
+class CompactAirQualityModel:
+    """Minimal NumPy-only loader for models exported with AirQualityModel.export_compact.
+
+    Only numpy is imported here so the module can be copied on its own to
+    edge gateways that cannot afford xgboost, sklearn and pandas.
+    """
+
+    def __init__(self, input_feature_names, feature_names, target_names, targets):
+        self.input_feature_names = list(input_feature_names)
+        self.feature_names = list(feature_names)
+        self.target_names = list(target_names)
+        self.targets = targets
+        self._input_columns = np.array(
+            [self.input_feature_names.index(name) for name in self.feature_names],
+            dtype=np.intp
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a compact model file written by AirQualityModel.export_compact"""
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version != COMPACT_FORMAT_VERSION:
+                raise ValueError(f"Unsupported compact model format version: {version}")
+
+            target_names = [str(name) for name in data['target_names']]
+            targets = []
+            for i in range(len(target_names)):
+                prefix = f't{i}_'
+                targets.append({
+                    'mean': data[prefix + 'scaler_mean'].astype(np.float64),
+                    'scale': data[prefix + 'scaler_scale'].astype(np.float64),
+                    'base_score': float(data[prefix + 'base_score']),
+                    'max_depth': int(data[prefix + 'max_depth']),
+                    'split_feature': data[prefix + 'split_feature'].astype(np.intp),
+                    'threshold': data[prefix + 'threshold'].astype(np.float32),
+                    # Leaf values may be stored as float16 and are widened once here
+                    'leaf_value': data[prefix + 'leaf_value'].astype(np.float32),
+                    'left': data[prefix + 'left'].astype(np.intp),
+                    'right': data[prefix + 'right'].astype(np.intp),
+                    'default_left': data[prefix + 'default_left'].astype(bool),
+                })
+
+            return cls(
+                [str(name) for name in data['input_feature_names']],
+                [str(name) for name in data['feature_names']],
+                target_names,
+                targets
+            )
+
+    def _select_features(self, X):
+        """Return the kept feature columns of X as a float64 array"""
+        if isinstance(X, dict):
+            X = [X]
+        if isinstance(X, (list, tuple)) and X and isinstance(X[0], dict):
+            X = [[row.get(name, np.nan) for name in self.feature_names] for row in X]
+
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        if X.shape[1] == len(self.input_feature_names):
+            return X[:, self._input_columns]
+        if X.shape[1] == len(self.feature_names):
+            return X
+        raise ValueError(
+            f"Expected {len(self.input_feature_names)} or {len(self.feature_names)} "
+            f"features, got {X.shape[1]}"
+        )
+
+    def _predict_target(self, target, X):
+        """Evaluate every tree of one target at once and sum the leaf values"""
+        X_scaled = ((X - target['mean']) / target['scale']).astype(np.float32)
+
+        split_feature = target['split_feature']
+        threshold = target['threshold']
+        n_samples = X_scaled.shape[0]
+        n_trees = split_feature.shape[0]
+
+        rows = np.arange(n_samples)[:, None]
+        trees = np.arange(n_trees)[None, :]
+        nodes = np.zeros((n_samples, n_trees), dtype=np.intp)
+
+        for _ in range(target['max_depth']):
+            left = target['left'][trees, nodes]
+            is_leaf = left < 0
+            if is_leaf.all():
+                break
+            values = X_scaled[rows, split_feature[trees, nodes]]
+            go_left = np.where(
+                np.isnan(values),
+                target['default_left'][trees, nodes],
+                values < threshold[trees, nodes]
+            )
+            next_nodes = np.where(go_left, left, target['right'][trees, nodes])
+            nodes = np.where(is_leaf, nodes, next_nodes)
+
+        leaf_values = target['leaf_value'][trees, nodes].astype(np.float64)
+        return target['base_score'] + leaf_values.sum(axis=1)
+
+    def predict(self, X):
+        """Make predictions; X is a 2-D array in input or kept feature order, or dict rows"""
+        X = self._select_features(X)
+        predictions = [self._predict_target(target, X) for target in self.targets]
+        return np.array(predictions).T
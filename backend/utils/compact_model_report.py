@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import subprocess
+import numpy as np
+import logging
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+
+from models.air_quality_model import AirQualityModel
+from models.compact_model import CompactAirQualityModel
+
+logger = logging.getLogger(__name__)
+
+# ru_maxrss survives fork/exec on Linux and would report the parent's peak, so
+# VmHWM is preferred where /proc exists; the resource module is missing on Windows
+PEAK_RSS_SNIPPET = """
+import os, sys
+def peak_rss_kb():
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, other platforms kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+"""
+
+# Snippets run in a fresh interpreter so import cost and peak memory are measured in isolation
+FULL_STARTUP_SNIPPET = """
+import json, time, warnings
+warnings.filterwarnings('ignore')
+start = time.perf_counter()
+import joblib
+model = joblib.load({path!r})
+elapsed = time.perf_counter() - start
+{peak_rss}print(json.dumps({{'startup_seconds': elapsed, 'peak_rss_kb': peak_rss_kb()}}))
+"""
+
+COMPACT_STARTUP_SNIPPET = """
+import json, time
+start = time.perf_counter()
+from models.compact_model import CompactAirQualityModel
+model = CompactAirQualityModel.load({path!r})
+elapsed = time.perf_counter() - start
+{peak_rss}print(json.dumps({{'startup_seconds': elapsed, 'peak_rss_kb': peak_rss_kb()}}))
+"""
+
+
+def measure_startup(snippet, path, repeats=3):
+    """Run a loading snippet in fresh interpreters and keep the fastest run"""
+    runs = []
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, '-c', snippet.format(path=path, peak_rss=PEAK_RSS_SNIPPET)],
+            capture_output=True, text=True, check=True, cwd=os.getcwd()
+        )
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['startup_seconds'])
+
+
+def _metrics(y_true, y_pred):
+    mse = mean_squared_error(y_true, y_pred)
+    return {
+        'r2': r2_score(y_true, y_pred),
+        'mae': mean_absolute_error(y_true, y_pred),
+        'rmse': float(np.sqrt(mse))
+    }
+
+
+def build_report(model_dir='models', dataset_path='data/AirQualityUCI.csv',
+                 precisions=('float32', 'float16')):
+    """Export compact models and compare them against the full model
+
+    Accuracy metrics are scored on the rows train() held out: its
+    train_test_split is reproduced with the same seed, and rows whose target
+    was never measured are skipped. The differences against the full model
+    are computed on every row.
+    """
+    model = AirQualityModel()
+    if not model.load_models(model_dir):
+        raise ValueError("No trained models available. Please train the model first.")
+
+    df = model.load_data(dataset_path)
+    measured = model.parse_data(dataset_path)[model.target_names].notna()
+    X, y = model.prepare_features(df)
+    full_predictions = model.predict(X)
+
+    _, X_holdout, _, _ = train_test_split(X, y, test_size=0.2, random_state=42)
+    holdout = X.index.isin(X_holdout.index)
+
+    def holdout_metrics(predictions):
+        metrics = {}
+        for i, target in enumerate(model.target_names):
+            rows = holdout & measured[target].to_numpy()
+            metrics[target] = _metrics(y[target][rows], predictions[rows, i])
+        return metrics
+
+    full_paths = [os.path.join(model_dir, name) for name in os.listdir(model_dir)
+                  if name.endswith('.pkl')]
+    report = {
+        'samples': len(X),
+        'holdout_samples': int(holdout.sum()),
+        'full': {
+            'file_bytes': os.path.getsize(os.path.join(model_dir, 'air_quality_model.pkl')),
+            'all_files_bytes': sum(os.path.getsize(path) for path in full_paths),
+            'features': len(model.feature_names),
+            'holdout_metrics': holdout_metrics(full_predictions),
+            **measure_startup(FULL_STARTUP_SNIPPET, os.path.join(model_dir, 'air_quality_model.pkl'))
+        }
+    }
+
+    for precision in precisions:
+        path = model.export_compact(
+            os.path.join(model_dir, f'air_quality_model_compact_{precision}.npz'), precision
+        )
+        compact = CompactAirQualityModel.load(path)
+        predictions = compact.predict(X.to_numpy())
+        difference = np.abs(predictions - full_predictions)
+
+        report[precision] = {
+            'file_bytes': os.path.getsize(path),
+            'features': len(compact.feature_names),
+            'holdout_metrics': holdout_metrics(predictions),
+            'diff_vs_full': {
+                target: {
+                    'max_abs': float(difference[:, i].max()),
+                    'mean_abs': float(difference[:, i].mean())
+                }
+                for i, target in enumerate(model.target_names)
+            },
+            **measure_startup(COMPACT_STARTUP_SNIPPET, path)
+        }
+
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(build_report(), indent=2))
@@ -0,0 +1,306 @@
+import os
+import json
+import html
+import time
+import hashlib
+import inspect
+import tempfile
+import argparse
+import numpy as np
+import pandas as pd
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+from sklearn.preprocessing import StandardScaler
+from sklearn.linear_model import LinearRegression
+from sklearn.ensemble import RandomForestRegressor
+
+from models.air_quality_model import AirQualityModel
+
+logger = logging.getLogger(__name__)
+
+# Candidate models: the production XGBoost configuration plus the notebook baselines
+MODEL_FACTORIES = {
+    'xgboost': lambda n_jobs: AirQualityModel().create_regressor(n_jobs=n_jobs),
+    'random_forest': lambda n_jobs: RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=n_jobs),
+    'linear': lambda n_jobs: LinearRegression()
+}
+
+# Parsed dataset shared by every fold evaluated in a worker process
+_worker_data = None
+
+
+def load_cached_data(dataset_path, cache_dir='data/cache'):
+    """Parse the dataset once and reuse the result while the CSV and parser are unchanged
+
+    The cached frame is not imputed: filling gaps with medians of the whole
+    timeline would leak test-period data into every fold.
+    """
+    digest = hashlib.sha256()
+    with open(dataset_path, 'rb') as f:
+        digest.update(f.read())
+    # Changes to the parsing code must invalidate the cache as well
+    digest.update(inspect.getsource(AirQualityModel.parse_data).encode())
+    digest = digest.hexdigest()[:16]
+
+    name = os.path.splitext(os.path.basename(dataset_path))[0]
+    cache_path = os.path.join(cache_dir, f'{name}_{digest}.pkl')
+
+    if os.path.exists(cache_path):
+        logger.info(f"Using cached parsed dataset at {cache_path}")
+    else:
+        df = AirQualityModel().parse_data(dataset_path)
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Write to a temporary file first so concurrent or interrupted runs never
+        # leave a partial pickle under the final cache key
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            df.sort_index().to_pickle(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        logger.info(f"Parsed dataset cached at {cache_path}")
+
+    return cache_path
+
+
+def rolling_origin_folds(index, n_folds, min_train_fraction=0.5):
+    """Split a sorted datetime index into expanding-window train/test folds
+
+    The first min_train_fraction of the timeline is always training data; the
+    remainder is cut into n_folds consecutive test blocks, each trained on
+    everything that precedes it.
+    """
+    if n_folds < 1:
+        raise ValueError(f"n_folds must be at least 1, got {n_folds}")
+    if not 0 < min_train_fraction < 1:
+        raise ValueError(f"min_train_fraction must be between 0 and 1, got {min_train_fraction}")
+
+    n_samples = len(index)
+    train_end = int(n_samples * min_train_fraction)
+    boundaries = np.linspace(train_end, n_samples, n_folds + 1).astype(int)
+
+    if boundaries[1] - boundaries[0] < 1 or train_end < 1:
+        raise ValueError(f"Not enough samples ({n_samples}) for {n_folds} folds")
+
+    return [(0, int(boundaries[i]), int(boundaries[i + 1])) for i in range(n_folds)]
+
+
+def _init_worker(cache_path):
+    global _worker_data
+    _worker_data = pd.read_pickle(cache_path)
+
+
+def evaluate_fold(fold_number, train_end, test_end, model_name, n_jobs):
+    """Fit every target on rows before train_end and score rows up to test_end"""
+    air_quality_model = AirQualityModel()
+    X, y = air_quality_model.prepare_features(_worker_data)
+
+    # Columns with no values in the training window (the trailing 'Unnamed' ones)
+    # carry no information and make StandardScaler warn on every fit
+    X = X.loc[:, X.iloc[:train_end].notna().any()]
+
+    X_train, y_train = X.iloc[:train_end], y.iloc[:train_end]
+    X_test, y_test = X.iloc[train_end:test_end], y.iloc[train_end:test_end]
+
+    # Impute features with training-window medians only
+    medians = X_train.median()
+    X_train = X_train.fillna(medians)
+    X_test = X_test.fillna(medians)
+
+    result = {
+        'fold': fold_number,
+        'train_start': str(X_train.index[0]),
+        'train_end': str(X_train.index[-1]),
+        'test_start': str(X_test.index[0]),
+        'test_end': str(X_test.index[-1]),
+        'train_samples': len(X_train),
+        'test_samples': len(X_test),
+        'targets': {}
+    }
+
+    for target in air_quality_model.target_names:
+        # Rows without a measured target are neither fitted nor scored
+        train_rows = y_train[target].notna().to_numpy()
+        test_rows = y_test[target].notna().to_numpy()
+        y_train_target = y_train[target][train_rows]
+        y_test_target = y_test[target][test_rows]
+
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train[train_rows])
+        X_test_scaled = scaler.transform(X_test[test_rows])
+
+        model = MODEL_FACTORIES[model_name](n_jobs)
+
+        start = time.perf_counter()
+        model.fit(X_train_scaled, y_train_target)
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        y_pred = model.predict(X_test_scaled)
+        predict_seconds = time.perf_counter() - start
+
+        mse = mean_squared_error(y_test_target, y_pred)
+        result['targets'][target] = {
+            'mse': float(mse),
+            'r2': float(r2_score(y_test_target, y_pred)),
+            'mae': float(mean_absolute_error(y_test_target, y_pred)),
+            'rmse': float(np.sqrt(mse)),
+            'scored_samples': int(test_rows.sum()),
+            'fit_seconds': fit_seconds,
+            'predict_rows_per_second': len(y_pred) / predict_seconds if predict_seconds > 0 else None
+        }
+
+    return result
+
+
+def summarize(fold_results, target_names):
+    """Average each per-target measurement across folds"""
+    summary = {}
+    for target in target_names:
+        rows = [fold['targets'][target] for fold in fold_results]
+        summary[target] = {}
+        for metric in rows[0]:
+            values = [row[metric] for row in rows if row[metric] is not None]
+            summary[target][metric] = {
+                'mean': float(np.mean(values)),
+                'std': float(np.std(values))
+            }
+    return summary
+
+
+def run_evaluation(dataset_path, model_name='xgboost', n_folds=5, workers=None,
+                   min_train_fraction=0.5, cache_dir='data/cache'):
+    """Run rolling-origin cross-validation with folds spread across processes"""
+    if model_name not in MODEL_FACTORIES:
+        raise ValueError(f"Unknown model: {model_name}")
+
+    cache_path = load_cached_data(dataset_path, cache_dir)
+    data = pd.read_pickle(cache_path)
+    folds = rolling_origin_folds(data.index, n_folds, min_train_fraction)
+
+    workers = workers or min(n_folds, os.cpu_count() or 1)
+    # Share the cores between processes instead of oversubscribing them
+    n_jobs = max(1, (os.cpu_count() or 1) // workers)
+
+    logger.info(f"Evaluating {model_name} on {n_folds} folds with {workers} workers")
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(cache_path,)) as executor:
+        futures = [
+            executor.submit(evaluate_fold, i, train_end, test_end, model_name, n_jobs)
+            for i, (_, train_end, test_end) in enumerate(folds)
+        ]
+        fold_results = [future.result() for future in futures]
+
+    target_names = AirQualityModel().target_names
+    return {
+        'model': model_name,
+        'dataset': dataset_path,
+        'folds': n_folds,
+        'workers': workers,
+        'min_train_fraction': min_train_fraction,
+        'wall_seconds': time.perf_counter() - start,
+        'timestamp': datetime.now().isoformat(),
+        'summary': summarize(fold_results, target_names),
+        'fold_results': fold_results
+    }
+
+
+def render_html(report):
+    """Render the evaluation report as a standalone HTML page"""
+    def cell(value):
+        return f'<td>{value:.4g}</td>' if isinstance(value, float) else f'<td>{html.escape(str(value))}</td>'
+
+    metrics = list(next(iter(report['summary'].values())).keys())
+    summary_rows = ''.join(
+        f'<tr><th>{html.escape(target)}</th>'
+        + ''.join(cell(values[metric]['mean']) + cell(values[metric]['std']) for metric in metrics)
+        + '</tr>'
+        for target, values in report['summary'].items()
+    )
+    fold_rows = ''.join(
+        f'<tr>{cell(fold["fold"])}{cell(fold["test_start"])}{cell(fold["test_end"])}'
+        f'{cell(fold["train_samples"])}{cell(fold["test_samples"])}<th>{html.escape(target)}</th>'
+        + ''.join(cell(values[metric]) for metric in metrics)
+        + '</tr>'
+        for fold in report['fold_results']
+        for target, values in fold['targets'].items()
+    )
+    metric_headers = ''.join(f'<th colspan="2">{html.escape(metric)}</th>' for metric in metrics)
+    fold_headers = ''.join(f'<th>{html.escape(metric)}</th>' for metric in metrics)
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Air Quality model evaluation - {html.escape(report['model'])}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: right; }}
+</style>
+</head>
+<body>
+<h1>Rolling-origin evaluation: {html.escape(report['model'])}</h1>
+<p>{report['folds']} folds, {report['workers']} workers, {report['wall_seconds']:.1f}s wall time,
+generated {html.escape(report['timestamp'])}</p>
+<h2>Summary (mean, std across folds)</h2>
+<table>
+<tr><th>Target</th>{metric_headers}</tr>
+{summary_rows}
+</table>
+<h2>Folds</h2>
+<table>
+<tr><th>Fold</th><th>Test start</th><th>Test end</th><th>Train rows</th><th>Test rows</th><th>Target</th>{fold_headers}</tr>
+{fold_rows}
+</table>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-series cross-validation for the air quality models")
+    parser.add_argument('--dataset', default='data/AirQualityUCI.csv', help="Path to the UCI Air Quality CSV")
+    parser.add_argument('--model', default='xgboost', choices=sorted(MODEL_FACTORIES), help="Model to evaluate")
+    parser.add_argument('--folds', type=int, default=5, help="Number of rolling-origin test folds")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per fold)")
+    parser.add_argument('--min-train-fraction', type=float, default=0.5,
+                        help="Share of the timeline always used for training")
+    parser.add_argument('--cache-dir', default='data/cache', help="Directory for the parsed dataset cache")
+    parser.add_argument('--output', default='reports/evaluation', help="Report path without extension")
+    args = parser.parse_args()
+
+    if args.folds < 1:
+        parser.error("--folds must be at least 1")
+    if not 0 < args.min_train_fraction < 1:
+        parser.error("--min-train-fraction must be between 0 and 1")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    report = run_evaluation(args.dataset, args.model, args.folds, args.workers,
+                            args.min_train_fraction, args.cache_dir)
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(f'{args.output}.json', 'w') as f:
+        json.dump(report, f, indent=2)
+    with open(f'{args.output}.html', 'w') as f:
+        f.write(render_html(report))
+
+    logger.info(f"Evaluation report written to {args.output}.json and {args.output}.html")
+    for target, values in report['summary'].items():
+        logger.info(f"{target} - R²: {values['r2']['mean']:.4f}, RMSE: {values['rmse']['mean']:.4f}, "
+                    f"fit: {values['fit_seconds']['mean']:.2f}s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()